@@ -18,17 +18,20 @@ Commands:
 
 import os
 import time
-import threading
 import json
+import re
+import random
 import asyncio
-from datetime import datetime
-import schedule
+import functools
+import hashlib
+import io
+from collections import OrderedDict
+from datetime import date, datetime
 import secrets
-from openai import OpenAI
+from openai import AsyncOpenAI, NOT_GIVEN
 from telethon import TelegramClient
-import requests
-import gspread
-from google.oauth2.service_account import Credentials
+import httpx
+import orjson
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     ApplicationBuilder, CommandHandler, CallbackQueryHandler,
@@ -42,6 +45,7 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_API_ID = int(os.getenv("TELEGRAM_API_ID"))
 TELEGRAM_API_HASH = os.getenv("TELEGRAM_API_HASH")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 USER_ID = int(os.getenv("USER_ID"))
 SUI_NODE_URL = os.getenv("SUI_NODE_URL")
 SUI_PACKAGE = os.getenv("SUI_PACKAGE")
@@ -53,13 +57,36 @@ GOOGLE_SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
 GOOGLE_SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
 
 DATA_FILE = "data_store.json"
+USAGE_FILE = "usage_log.jsonl"
+USAGE_MAX_BYTES = 5_000_000
+FLUSH_INTERVAL = 2.0
+CHAT_CONCURRENCY = 5
+READALL_DIALOG_LIMIT = 50
+BRIEF_DIALOG_LIMIT = 3
+CONTACT_TEXT_LIMIT = 30
+STREAM_EDIT_INTERVAL = 1.0
+AI_CACHE_SIZE = 256
+MAX_PROMPT_CHARS = 24000  # roughly 6000 tokens of chat history per prompt
+SUI_POLL_INTERVAL = 60
+SUI_MAX_BACKOFF = 3600
 KEYWORDS = [
     "urgent", "invoice", "@yourname", "asap", "important", "reminder",
     "deadline", "follow up", "todo", "meeting", "action required", "payment",
     "feedback", "review", "blocker", "question", "help", "fix", "resolve"
 ]
+FOLLOWUP_KEYWORDS = ["todo", "pending", "follow up"]
 
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# Single-pass matchers instead of one substring scan per keyword
+_KEYWORD_RE = re.compile("|".join(map(re.escape, KEYWORDS)), re.IGNORECASE)
+_FOLLOWUP_RE = re.compile("|".join(map(re.escape, FOLLOWUP_KEYWORDS)), re.IGNORECASE)
+
+# One connection pool shared by OpenAI and the Sui RPC poller. The long read
+# timeout matches OpenAI's default; the Sui poller sets its own per request.
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+    timeout=httpx.Timeout(600, connect=5),
+)
+openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
 
 def load_context():
     """Load custom GPT context from file if available."""
@@ -69,65 +96,226 @@ def load_context():
     return ""
 
 GPT_CONTEXT = load_context()
-sui_cursor = None
+_CONTEXT_MESSAGES = [{"role": "system", "content": GPT_CONTEXT}] if GPT_CONTEXT else []
+_sui_backoff = SUI_POLL_INTERVAL
+tg_client = None
 
 # === DATA FUNCTIONS ===
+_data_cache = None
+_data_dirty = False
+_flusher_task = None
+_flush_write = None
+_notes_by_day = {}
+
+def _set_data_cache(data):
+    """Install a freshly loaded store and rebuild the per-day note index."""
+    global _data_cache, _notes_by_day
+    _data_cache = data
+    _notes_by_day = {}
+    for n in data["notes"]:
+        _notes_by_day.setdefault(n["timestamp"][:10], []).append(n)
+
 def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {"notes": [], "usage": []}
+    """Return the data store, reading the file only on first use."""
+    # The bot is the only writer, so the in-memory copy stays authoritative
+    if _data_cache is None:
+        try:
+            with open(DATA_FILE, "rb") as f:
+                data = orjson.loads(f.read())
+        except FileNotFoundError:
+            data = {"notes": []}
+        legacy_usage = data.pop("usage", None)
+        if legacy_usage is not None:
+            # Older stores kept usage inline; move it to the usage log once
+            with open(USAGE_FILE, "ab") as f:
+                f.writelines(orjson.dumps(record) + b"\n" for record in legacy_usage)
+            mark_dirty()
+        _set_data_cache(data)
+    return _data_cache
+
+def _write_store(payload):
+    """Atomically replace the data file with already serialized bytes."""
+    tmp_file = f"{DATA_FILE}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_file, DATA_FILE)
 
 def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    """Atomically write the data store."""
+    _write_store(orjson.dumps(data))
+
+def mark_dirty():
+    """Flag the in-memory store for the next background flush."""
+    global _data_dirty
+    _data_dirty = True
+
+def flush_data():
+    """Write the store to disk if it has unsaved changes."""
+    global _data_dirty
+    if _data_dirty:
+        _data_dirty = False
+        save_data(_data_cache)
+
+async def data_flusher():
+    """Coalesce store mutations into at most one write per FLUSH_INTERVAL."""
+    global _data_dirty, _flush_write
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        if _data_dirty:
+            # Snapshot on the event loop; only the file write runs in a thread
+            _data_dirty = False
+            payload = orjson.dumps(_data_cache)
+            _flush_write = asyncio.ensure_future(asyncio.to_thread(_write_store, payload))
+            try:
+                # Shielded so cancelling the flusher never abandons a half-done write
+                await asyncio.shield(_flush_write)
+            except Exception as e:
+                # Keep the changes pending and retry on the next interval
+                print("data flush failed", e)
+                _data_dirty = True
 
 def add_note(text):
     data = load_data()
-    data["notes"].append({"timestamp": datetime.now().isoformat(), "text": text})
-    save_data(data)
+    note = {"timestamp": datetime.now().isoformat(), "text": text}
+    data["notes"].append(note)
+    _notes_by_day.setdefault(note["timestamp"][:10], []).append(note)
+    mark_dirty()
 
 def get_today_notes():
-    data = load_data()
-    today = datetime.now().date().isoformat()
-    return [n for n in data["notes"] if today in n["timestamp"]]
+    load_data()
+    return list(_notes_by_day.get(date.today().isoformat(), []))
 
 def get_recent_notes(n=5):
     return load_data()["notes"][-n:]
 
 def log_usage(usage):
-    data = load_data()
-    data["usage"].append({
+    """Append one token-usage record to the usage log."""
+    record = {
         "timestamp": datetime.now().isoformat(),
         "prompt_tokens": usage.prompt_tokens,
         "completion_tokens": usage.completion_tokens,
         "total_tokens": usage.total_tokens
-    })
-    save_data(data)
+    }
+    with open(USAGE_FILE, "ab") as f:
+        f.write(orjson.dumps(record) + b"\n")
+        size = f.tell()
+    if size > USAGE_MAX_BYTES:
+        # Keep one rotated generation so the live log stays small
+        os.replace(USAGE_FILE, f"{USAGE_FILE}.1")
 
 # === OPENAI CHAT ===
-def openai_chat(messages, temperature=0.6):
-    if GPT_CONTEXT:
-        messages = [{"role": "system", "content": GPT_CONTEXT}] + messages
-    response = openai_client.chat.completions.create(
-        model="gpt-4",
+_ai_cache = OrderedDict()
+
+async def openai_chat(messages, temperature=0.6, response_format=NOT_GIVEN, cache=False, parse=None):
+    """Run a chat completion; with cache=True identical prompts reuse the last parsed answer."""
+    # parse runs before caching, so a reply it rejects is never served again
+    messages = _CONTEXT_MESSAGES + messages
+    if cache:
+        key = hashlib.blake2b(orjson.dumps(messages), digest_size=16).digest()
+        if key in _ai_cache:
+            _ai_cache.move_to_end(key)
+            return _ai_cache[key]
+    response = await openai_client.chat.completions.create(
+        model=OPENAI_MODEL,
         messages=messages,
-        temperature=temperature
+        temperature=temperature,
+        response_format=response_format,
     )
     log_usage(response.usage)
-    return response.choices[0].message.content
-
-def summarize_messages(messages):
-    text_block = "\n".join(messages)
-    return openai_chat(
+    content = response.choices[0].message.content
+    if parse:
+        content = parse(content)
+    if cache:
+        _ai_cache[key] = content
+        if len(_ai_cache) > AI_CACHE_SIZE:
+            _ai_cache.popitem(last=False)
+    return content
+
+async def openai_chat_stream(messages, temperature=0.6):
+    """Yield completion text as it streams in, logging usage from the final chunk."""
+    stream = await openai_client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=_CONTEXT_MESSAGES + messages,
+        temperature=temperature,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    async for chunk in stream:
+        if chunk.usage:
+            log_usage(chunk.usage)
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def clean_texts(texts):
+    """Strip messages, dropping very short ones and consecutive repeats."""
+    cleaned, prev = [], None
+    for text in texts:
+        text = text.strip()
+        if len(text) < 3 or text == prev:
+            continue
+        cleaned.append(text)
+        prev = text
+    return cleaned
+
+def truncate_texts(texts, budget=MAX_PROMPT_CHARS):
+    """Keep the leading (newest) messages that fit within the prompt character budget."""
+    kept, used = [], 0
+    for text in texts:
+        used += len(text) + 1
+        if used > budget:
+            break
+        kept.append(text)
+    if not kept and texts:
+        kept.append(texts[0][:budget])
+    return kept
+
+async def summarize_messages(messages):
+    text_block = "\n".join(truncate_texts(clean_texts(messages)))
+    return await openai_chat(
         [
             {"role": "system", "content": "Summarize these chat messages and suggest follow-ups."},
             {"role": "user", "content": text_block}
-        ]
+        ],
+        cache=True,
+    )
+
+def _parse_contact(content):
+    """Parse an analyze_contact reply into (summary, follow-up), rejecting malformed JSON."""
+    result = json.loads(content)
+    if not isinstance(result, dict):
+        raise ValueError("expected a JSON object from the model")
+    return result.get("summary", ""), result.get("follow", "")
+
+async def analyze_contact(texts, previous=None):
+    """Return (summary, follow-up) for a chat history from a single JSON completion."""
+    text_block = "\n".join(truncate_texts(clean_texts(texts)))
+    if previous:
+        # Only new messages are sent; fold them into the stored summary
+        text_block = (
+            f"PREVIOUS SUMMARY:\n{previous['summary']}\n"
+            f"PREVIOUS FOLLOW-UP:\n{previous['follow']}\n\nNEW:\n{text_block}"
+        )
+    return await openai_chat(
+        [
+            {
+                "role": "system",
+                "content": (
+                    "You are a business development assistant for a Sui DeFi startup. "
+                    "Reply with a JSON object with two string fields: \"summary\", a summary of "
+                    "these chat messages with suggested follow-ups, and \"follow\", the deal "
+                    "progress and recommended next actions. If a previous summary is given, "
+                    "update it with the new messages."
+                ),
+            },
+            {"role": "user", "content": text_block},
+        ],
+        response_format={"type": "json_object"},
+        cache=True,
+        parse=_parse_contact,
     )
 
 def generate_text(prompt):
-    return openai_chat(
+    return openai_chat_stream(
         [
             {"role": "system", "content": "You are a helpful assistant that writes professional messages."},
             {"role": "user", "content": prompt}
@@ -136,25 +324,31 @@ def generate_text(prompt):
     )
 
 def generate_brief(notes, summaries):
-    note_text = "\n".join([f"- {n['text']}" for n in notes]) or "No notes."
+    note_text = "\n".join(f"- {n['text']}" for n in notes) or "No notes."
     chat_summary = "\n".join(summaries) or "No recent chat summaries."
-    return openai_chat(
+    return openai_chat_stream(
         [
             {"role": "system", "content": "You generate clear, insightful daily briefings."},
             {"role": "user", "content": f"NOTES:\n{note_text}\n\nCHATS:\n{chat_summary}"},
         ]
     )
 
+_MEETING_PREFIX = MEETING_URL_BASE.rstrip("/") + "/"
+
 def generate_meeting_link():
     """Create a unique meeting link using the configured base URL."""
-    token = secrets.token_urlsafe(8)
-    return f"{MEETING_URL_BASE.rstrip('/')}/{token}"
+    return _MEETING_PREFIX + secrets.token_urlsafe(8)
 
 # === GOOGLE SHEETS INTEGRATION ===
+@functools.lru_cache(maxsize=1)
 def get_sheet():
-    """Return the Google Sheet client if configured."""
+    """Return the Google Sheet client if configured, cached across /leads calls."""
     if not GOOGLE_SERVICE_ACCOUNT_FILE or not GOOGLE_SPREADSHEET_ID:
         raise RuntimeError("Google Sheets not configured")
+    # Imported lazily: the Google client stack is only needed for /leads
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     creds = Credentials.from_service_account_file(
         GOOGLE_SERVICE_ACCOUNT_FILE,
         scopes=["https://www.googleapis.com/auth/spreadsheets"],
@@ -162,104 +356,151 @@ def get_sheet():
     client = gspread.authorize(creds)
     return client.open_by_key(GOOGLE_SPREADSHEET_ID).sheet1
 
+async def fetch_texts(chat_id, limit, max_texts=None, min_id=0):
+    """Stream a chat's newest messages; return (texts, newest message), stopping at max_texts."""
+    texts = []
+    newest = None
+    async for m in tg_client.iter_messages(chat_id, limit=limit, min_id=min_id):
+        if newest is None:
+            newest = m
+        if m.message:
+            texts.append(m.message)
+            if max_texts and len(texts) >= max_texts:
+                break
+    return texts, newest
+
 async def collect_contact_data():
     """Gather message summaries and follow-up suggestions for each chat."""
-    results = []
-    async with TelegramClient("session", TELEGRAM_API_ID, TELEGRAM_API_HASH) as client:
-        async for dialog in client.iter_dialogs():
+    sem = asyncio.Semaphore(CHAT_CONCURRENCY)
+    cached = load_data().setdefault("dialog_summaries", {})
+
+    async def process(dialog):
+        async with sem:
             try:
-                msgs = await client.get_messages(dialog.id, limit=50)
-                texts = [m.message for m in msgs if m.message]
+                key = str(dialog.id)
+                previous = cached.get(key)
+                min_id = previous["last_id"] if previous else 0
+                texts, newest = await fetch_texts(dialog.id, 50, CONTACT_TEXT_LIMIT, min_id)
                 if not texts:
-                    continue
-                summary = await asyncio.to_thread(summarize_messages, texts)
-                follow = await asyncio.to_thread(
-                    openai_chat,
-                    [
-                        {
-                            "role": "system",
-                            "content": (
-                                "You are a business development assistant for a Sui DeFi startup. "
-                                "Based on this chat history, summarize the deal progress and suggest next actions."
-                            ),
-                        },
-                        {"role": "user", "content": "\n".join(texts)},
-                    ],
-                )
-                last_date = msgs[0].date.strftime("%Y-%m-%d") if msgs else ""
-                results.append(
-                    {
-                        "contact": dialog.name,
-                        "last": last_date,
+                    if not previous:
+                        return None
+                    entry = previous
+                else:
+                    summary, follow = await analyze_contact(texts, previous)
+                    entry = {
+                        "last_id": newest.id,
+                        "last": newest.date.strftime("%Y-%m-%d"),
                         "summary": summary,
                         "follow": follow,
                     }
-                )
+                    cached[key] = entry
+                    mark_dirty()
+                return {
+                    "contact": dialog.name,
+                    "last": entry["last"],
+                    "summary": entry["summary"],
+                    "follow": entry["follow"],
+                }
             except Exception as e:  # pragma: no cover - debug messages
                 print("collect_contact_data failed", dialog.name, e)
-    return results
+                return e
+
+    tasks = [asyncio.create_task(process(dialog)) async for dialog in tg_client.iter_dialogs()]
+    results = await asyncio.gather(*tasks)
+    rows = [r for r in results if isinstance(r, dict)]
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors and not rows:
+        # e.g. OPENAI_MODEL without JSON mode: fail loudly instead of syncing nothing
+        raise RuntimeError(f"all {len(errors)} chats failed, first error: {errors[0]}")
+    return rows, len(errors)
+
+def _write_sheet(values):
+    sheet = get_sheet()
+    sheet.clear()
+    sheet.update(range_name="A1", values=values, value_input_option="RAW")
 
 def update_sheet(rows):
     """Write the collected data to the Google Sheet."""
-    sheet = get_sheet()
-    sheet.clear()
-    sheet.append_row(["Contact", "Last Message", "Summary", "Recommendation"])
-    for r in rows:
-        sheet.append_row([r["contact"], r["last"], r["summary"], r["follow"]])
+    from gspread.exceptions import APIError
+
+    values = [["Contact", "Last Message", "Summary", "Recommendation"]]
+    values.extend([r["contact"], r["last"], r["summary"], r["follow"]] for r in rows)
+    try:
+        _write_sheet(values)
+    except APIError as e:
+        if e.response.status_code != 401:
+            raise
+        # Cached credentials were rejected: rebuild the client once and retry
+        get_sheet.cache_clear()
+        _write_sheet(values)
 
 async def sync_sheet(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Command handler to sync contact data to Google Sheets."""
     await context.bot.send_message(USER_ID, "⏳ Syncing messages to Google Sheet...")
     try:
-        rows = await collect_contact_data()
+        rows, failed = await collect_contact_data()
         await asyncio.to_thread(update_sheet, rows)
-        await context.bot.send_message(USER_ID, f"✅ Synced {len(rows)} chats to the sheet.")
+        text = f"✅ Synced {len(rows)} chats to the sheet."
+        if failed:
+            text += f"\n⚠️ {failed} chats could not be analyzed."
+        await context.bot.send_message(USER_ID, text)
     except Exception as e:
         await context.bot.send_message(USER_ID, f"❌ Sheet sync failed: {e}")
 
 # === TELEGRAM HANDLERS ===
+async def send_streamed(context, prefix, chunks):
+    """Send a placeholder message and edit it as streamed text arrives."""
+    message = await context.bot.send_message(USER_ID, f"{prefix}…")
+    text = ""
+    last_edit = time.monotonic()
+    async for delta in chunks:
+        text += delta
+        if time.monotonic() - last_edit >= STREAM_EDIT_INTERVAL:
+            await message.edit_text(f"{prefix}{text}…")
+            last_edit = time.monotonic()
+    await message.edit_text(f"{prefix}{text}")
+
+# Main menu keyboard, built once at import
+_START_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📋 Brief", callback_data="brief"),
+     InlineKeyboardButton("📝 Note", callback_data="note")],
+    [InlineKeyboardButton("📊 Summary", callback_data="summary"),
+     InlineKeyboardButton("📅 Follow-up", callback_data="followup")],
+    [InlineKeyboardButton("🔗 Meeting", callback_data="meeting")],
+    [InlineKeyboardButton("📈 Leads", callback_data="leads")],
+    [InlineKeyboardButton("🧠 Generate", callback_data="generate"),
+     InlineKeyboardButton("ℹ️ Help", callback_data="help")],
+])
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send the main menu with inline buttons."""
-    buttons = [
-        [InlineKeyboardButton("📋 Brief", callback_data="brief"),
-         InlineKeyboardButton("📝 Note", callback_data="note")],
-        [InlineKeyboardButton("📊 Summary", callback_data="summary"),
-         InlineKeyboardButton("📅 Follow-up", callback_data="followup")],
-        [InlineKeyboardButton("🔗 Meeting", callback_data="meeting")],
-        [InlineKeyboardButton("📈 Leads", callback_data="leads")],
-        [InlineKeyboardButton("🧠 Generate", callback_data="generate"),
-         InlineKeyboardButton("ℹ️ Help", callback_data="help")],
-    ]
-    await update.message.reply_text("Welcome! Choose a feature:", reply_markup=InlineKeyboardMarkup(buttons))
+    await update.message.reply_text("Welcome! Choose a feature:", reply_markup=_START_MARKUP)
+
+# Menu buttons that only reply with usage text
+_MENU_TEXT = {
+    "note": "Use /note <text> to save a note.",
+    "meeting": "Use /meeting [topic] to get a link.",
+    "leads": "Use /leads to sync Google sheet with chat summaries.",
+    "generate": "Use /generate <prompt> to generate text.",
+    "help": (
+        "/note <text> — Save a note\n"
+        "/summary — View notes\n"
+        "/followup — Tasks with 'todo', 'pending'\n"
+        "/generate <prompt> — Write AI message\n"
+        "/brief — Full AI-powered daily briefing\n"
+        "/leads — Sync Google sheet with chat deals"
+    ),
+}
 
 async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle button presses from the main menu."""
     query = update.callback_query
     await query.answer()
-    if query.data == "brief":
-        await brief(update, context)
-    elif query.data == "note":
-        await context.bot.send_message(USER_ID, "Use /note <text> to save a note.")
-    elif query.data == "summary":
-        await summary(update, context)
-    elif query.data == "followup":
-        await followup(update, context)
-    elif query.data == "meeting":
-        await context.bot.send_message(USER_ID, "Use /meeting [topic] to get a link.")
-    elif query.data == "leads":
-        await context.bot.send_message(USER_ID, "Use /leads to sync Google sheet with chat summaries.")
-    elif query.data == "generate":
-        await context.bot.send_message(USER_ID, "Use /generate <prompt> to generate text.")
-    elif query.data == "help":
-        await context.bot.send_message(
-            USER_ID,
-            "/note <text> — Save a note\n"
-            "/summary — View notes\n"
-            "/followup — Tasks with 'todo', 'pending'\n"
-            "/generate <prompt> — Write AI message\n"
-            "/brief — Full AI-powered daily briefing\n"
-            "/leads — Sync Google sheet with chat deals",
-        )
+    handler = _MENU_HANDLERS.get(query.data)
+    if handler:
+        await handler(update, context)
+    elif query.data in _MENU_TEXT:
+        await context.bot.send_message(USER_ID, _MENU_TEXT[query.data])
 
 async def note(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Store a note sent by the user."""
@@ -274,15 +515,15 @@ async def summary(update: Update, context: ContextTypes.DEFAULT_TYPE):
     notes = get_recent_notes()
     if not notes:
         return await context.bot.send_message(USER_ID, "🧾 No notes yet.")
-    await context.bot.send_message(USER_ID, "\n".join([f"{n['timestamp']}: {n['text']}" for n in notes]))
+    await context.bot.send_message(USER_ID, "\n".join(f"{n['timestamp']}: {n['text']}" for n in notes))
 
 async def followup(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List today's notes that look like action items."""
     notes = get_today_notes()
-    action_items = [n for n in notes if any(kw in n["text"].lower() for kw in ["todo", "pending", "follow up"])]
+    action_items = [n for n in notes if _FOLLOWUP_RE.search(n["text"])]
     if not action_items:
         return await context.bot.send_message(USER_ID, "✅ No follow-ups today.")
-    await context.bot.send_message(USER_ID, "\n".join([f"- {n['text']}" for n in action_items]))
+    await context.bot.send_message(USER_ID, "\n".join(f"- {n['text']}" for n in action_items))
 
 async def generate(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Generate text with ChatGPT using the user's prompt."""
@@ -290,8 +531,7 @@ async def generate(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not prompt:
         return await context.bot.send_message(USER_ID, "⚠️ Usage: /generate your prompt")
     try:
-        result = await asyncio.to_thread(generate_text, prompt)
-        await context.bot.send_message(USER_ID, f"✍️ {result}")
+        await send_streamed(context, "✍️ ", generate_text(prompt))
     except Exception as e:
         await context.bot.send_message(USER_ID, f"❌ Error: {e}")
 
@@ -304,104 +544,152 @@ async def meeting(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def read_all(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send recent messages from all chats."""
     try:
-        async with TelegramClient("session", TELEGRAM_API_ID, TELEGRAM_API_HASH) as client:
-            dialogs = []
-            async for dialog in client.iter_dialogs():
-                dialogs.append(dialog)
-
-            lines = []
-            for dialog in dialogs:
-                msgs = await client.get_messages(dialog.id, limit=50)
-                for msg in reversed(msgs):
-                    if msg.message:
-                        sender = msg.sender_id
-                        lines.append(f"[{dialog.name}] {sender}: {msg.message}")
-
-            if not lines:
-                return await context.bot.send_message(USER_ID, "No messages found.")
-
-            text = "\n".join(lines)
-            if len(text) > 4000:
-                with open("all_messages.txt", "w") as f:
-                    f.write(text)
-                await context.bot.send_document(USER_ID, document="all_messages.txt")
-                os.remove("all_messages.txt")
-            else:
-                await context.bot.send_message(USER_ID, text)
+        sem = asyncio.Semaphore(CHAT_CONCURRENCY)
+
+        async def fetch(dialog):
+            async with sem:
+                return dialog, await tg_client.get_messages(dialog.id, limit=50)
+
+        # Start fetching each chat's messages while dialogs are still being listed
+        tasks = [
+            asyncio.create_task(fetch(dialog))
+            async for dialog in tg_client.iter_dialogs(limit=READALL_DIALOG_LIMIT)
+        ]
+        results = await asyncio.gather(*tasks)
+
+        # Encode lines straight into an in-memory buffer that can be uploaded as-is
+        buf = io.BytesIO()
+        for dialog, msgs in results:
+            for msg in reversed(msgs):
+                text = msg.message
+                if text:
+                    buf.write(f"[{dialog.name}] {msg.sender_id}: {text}\n".encode())
+
+        if not buf.tell():
+            return await context.bot.send_message(USER_ID, "No messages found.")
+        if buf.tell() > 4000:
+            buf.seek(0)
+            await context.bot.send_document(USER_ID, document=buf, filename="all_messages.txt")
+        else:
+            await context.bot.send_message(USER_ID, buf.getvalue().decode().rstrip("\n"))
     except Exception as e:
         await context.bot.send_message(USER_ID, f"❌ Error fetching messages: {e}")
 
 async def brief(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send a daily briefing summarizing notes and recent chats."""
     try:
+        sem = asyncio.Semaphore(CHAT_CONCURRENCY)
+
+        async def summarize_chat(chat):
+            async with sem:
+                texts, _ = await fetch_texts(chat.id, 20)
+                return await summarize_messages(texts)
+
         async def fetch_summary():
-            async with TelegramClient("session", TELEGRAM_API_ID, TELEGRAM_API_HASH) as client:
-                chats = []
-                async for dialog in client.iter_dialogs():
-                    chats.append(dialog)
-                    if len(chats) >= 3:
-                        break
-
-                results = []
-                for chat in chats:
-                    msgs = await client.get_messages(chat.id, limit=20)
-                    texts = [m.message for m in msgs if m.message]
-                    summary = await asyncio.to_thread(summarize_messages, texts)
-                    results.append(summary)
-                return results
+            tasks = [
+                asyncio.create_task(summarize_chat(chat))
+                async for chat in tg_client.iter_dialogs(limit=BRIEF_DIALOG_LIMIT)
+            ]
+            return await asyncio.gather(*tasks)
 
         notes = get_today_notes()
         summaries = await fetch_summary()
-        full_brief = await asyncio.to_thread(generate_brief, notes, summaries)
-        await context.bot.send_message(USER_ID, f"📋 Your Daily Briefing:\n\n{full_brief}")
+        await send_streamed(context, "📋 Your Daily Briefing:\n\n", generate_brief(notes, summaries))
     except Exception as e:
         await context.bot.send_message(USER_ID, f"❌ Briefing failed: {e}")
 
 async def keyword_filter(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Notify when incoming messages contain tracked keywords."""
-    text = update.message.text.lower()
-    if any(k in text for k in KEYWORDS):
+    text = update.message.text
+    if not text:
+        return
+    if _KEYWORD_RE.search(text):
         await context.bot.send_message(USER_ID, f"🔔 Keyword detected:\n{text}")
 
-async def check_sui_events(app):
-    """Poll Sui RPC for events from the configured contract."""
-    global sui_cursor
-    if not SUI_NODE_URL or not SUI_PACKAGE or not SUI_MODULE:
-        return
+async def check_sui_events(context: ContextTypes.DEFAULT_TYPE):
+    """Poll Sui RPC for contract events, rescheduling with backoff on failure."""
+    global _sui_backoff
     try:
+        data = load_data()
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
             "method": "suix_queryEvents",
             "params": [
                 {"MoveEventModule": {"package": SUI_PACKAGE, "module": SUI_MODULE}},
-                sui_cursor,
+                data.get("sui_cursor"),
                 10,
                 False,
             ],
         }
-        r = requests.post(SUI_NODE_URL, json=payload, timeout=10)
+        r = await http_client.post(SUI_NODE_URL, json=payload, timeout=10)
         r.raise_for_status()
         res = r.json().get("result", {})
         events = res.get("data", [])
         if events:
-            sui_cursor = res.get("nextCursor")
+            # Persist the cursor so a restart resumes instead of replaying events
+            data["sui_cursor"] = res.get("nextCursor")
+            mark_dirty()
             for ev in events:
-                await app.bot.send_message(USER_ID, f"📣 Sui event detected:\n{ev}")
+                await context.bot.send_message(USER_ID, f"📣 Sui event detected:\n{ev}")
+        _sui_backoff = SUI_POLL_INTERVAL
     except Exception as e:
+        _sui_backoff = min(_sui_backoff * 2, SUI_MAX_BACKOFF)
         print("Sui check failed", e)
-
-# === SCHEDULER LOOP ===
-def run_schedule(app):
-    """Background thread running the scheduled jobs."""
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    finally:
+        delay = _sui_backoff
+        if delay > SUI_POLL_INTERVAL:
+            delay += random.uniform(0, delay / 10)
+        context.job_queue.run_once(check_sui_events, delay)
+
+# Menu buttons that run a command handler directly
+_MENU_HANDLERS = {
+    "brief": brief,
+    "summary": summary,
+    "followup": followup,
+}
+
+# === LIFECYCLE ===
+async def post_init(app):
+    """Connect the shared clients and start background tasks."""
+    global _flusher_task, tg_client
+    tg_client = TelegramClient("session", TELEGRAM_API_ID, TELEGRAM_API_HASH)
+    await tg_client.start()
+    # Parse the store off the event loop so handlers start with a warm cache
+    await asyncio.to_thread(load_data)
+    _flusher_task = asyncio.create_task(data_flusher())
+
+async def post_shutdown(app):
+    """Stop background tasks, close shared clients and persist pending changes."""
+    if _flusher_task:
+        _flusher_task.cancel()
+    try:
+        if _flush_write:
+            result, = await asyncio.gather(_flush_write, return_exceptions=True)
+            if isinstance(result, Exception):
+                mark_dirty()
+        if tg_client:
+            await tg_client.disconnect()
+        await http_client.aclose()
+    finally:
+        flush_data()
 
 # === MAIN ===
 def main():
     """Initialize handlers and start the bot."""
-    app = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
+    try:
+        # Optional faster event loop; unavailable on Windows
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    app = (
+        ApplicationBuilder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("note", note))
@@ -415,10 +703,10 @@ def main():
     app.add_handler(CallbackQueryHandler(menu_callback))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, keyword_filter))
 
-    schedule.every(60).seconds.do(lambda: asyncio.run(check_sui_events(app)))
+    if SUI_NODE_URL and SUI_PACKAGE and SUI_MODULE:
+        app.job_queue.run_once(check_sui_events, 5)
 
     print("🤖 Bot is running...")
-    threading.Thread(target=run_schedule, args=(app,), daemon=True).start()
     app.run_polling()
 
 if __name__ == "__main__":
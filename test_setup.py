@@ -16,7 +16,8 @@ def test_imports():
         "telegram",
         "openai",
         "dotenv",
-        "schedule",
+        "apscheduler",
+        "orjson",
         "asyncio"
     ]
 
@@ -88,7 +89,7 @@ def test_data_file():
     print("\n🔍 Testing data storage...")
 
     try:
-        import json
+        import orjson
         from datetime import datetime
 
         test_data = {
@@ -96,11 +97,11 @@ def test_data_file():
             "usage": []
         }
 
-        with open("test_data.json", "w") as f:
-            json.dump(test_data, f, indent=2)
+        with open("test_data.json", "wb") as f:
+            f.write(orjson.dumps(test_data))
 
-        with open("test_data.json", "r") as f:
-            loaded_data = json.load(f)
+        with open("test_data.json", "rb") as f:
+            loaded_data = orjson.loads(f.read())
 
         os.remove("test_data.json")
 